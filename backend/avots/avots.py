@@ -79,6 +79,16 @@ AVOT_REGISTRY = {
 }
 
 
+# (avot_id, action) -> bound method, so dispatch is a single lookup.
+# Rebuild if AVOT_REGISTRY is modified at runtime.
+AVOT_METHOD_TABLE = {
+    (avot_id, attr): getattr(avot, attr)
+    for avot_id, avot in AVOT_REGISTRY.items()
+    for attr in dir(type(avot))
+    if not attr.startswith("_") and attr != "call" and callable(getattr(avot, attr))
+}
+
+
 def get_avot(name: str) -> AVOT:
     """
     Retrieve an AVOT instance by ID.
@@ -90,13 +100,12 @@ def call_avot(name: str, action: str) -> str:
     """
     Generic AVOT action executor.
     """
-    avot = get_avot(name)
-    if avot is None:
+    method = AVOT_METHOD_TABLE.get((name, action))
+    if method is not None:
+        return method()
+    if name not in AVOT_REGISTRY:
         return f"Unknown AVOT: {name}"
-    method = getattr(avot, action, None)
-    if method is None:
-        return f"Unknown action '{action}' for AVOT '{name}'"
-    return method()
+    return f"Unknown action '{action}' for AVOT '{name}'"
 
 
 # ---------------------------------------------------------------
@@ -1,8 +1,10 @@
 from __future__ import annotations
 import os, json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import numpy as np
 
+from backend.fs_helpers import atomic_replace
+
 
 class BasinEngine:
     """
@@ -23,6 +25,7 @@ class BasinEngine:
     """
 
     OUTPUT_DIR = "visuals/phase"
+    INDEX_NAME = "basin-index.json"
 
     def __init__(self):
         os.makedirs(self.OUTPUT_DIR, exist_ok=True)
@@ -43,21 +46,95 @@ class BasinEngine:
         data["path"] = path
         return data
 
+    def _index_path(self) -> str:
+        return os.path.join(self.OUTPUT_DIR, self.INDEX_NAME)
+
+    @staticmethod
+    def _version_num(version: Any) -> Optional[float]:
+        try:
+            return float(version)
+        except (TypeError, ValueError):
+            return None
+
+    def load_index(self) -> Dict[str, Any]:
+        path = self._index_path()
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except Exception:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def update_index(self, version: str, force: bool = False):
+        """
+        Record `version` as the latest basin if it is numerically newest
+        (or unconditionally with force=True, after a full rescan). An
+        unparseable existing pointer counts as missing.
+        """
+        v = self._version_num(version)
+        if v is None:
+            return
+        if not force:
+            if self._index_fresh():
+                current = self._version_num(self.load_index().get("latest"))
+                if current is not None and current > v:
+                    return
+            else:
+                # Basin files changed since the pointer was written: the
+                # newest one on disk wins, not the stale pointer or `version`.
+                latest = self._scan_latest_version()
+                if latest is not None and self._version_num(latest) > v:
+                    version = latest
+        path = self._index_path()
+        with atomic_replace(path, text=True) as f:
+            json.dump({"latest": version}, f, indent=2)
+        # Stamp the index after the rename, so its mtime is >= the
+        # directory's; any basin file added later makes it look stale.
+        os.utime(path)
+
+    def _index_fresh(self) -> bool:
+        try:
+            return os.stat(self.OUTPUT_DIR).st_mtime_ns <= os.stat(self._index_path()).st_mtime_ns
+        except FileNotFoundError:
+            return False
+
+    def _scan_latest_version(self) -> Optional[str]:
+        versions = []
+        for f in os.listdir(self.OUTPUT_DIR):
+            if f.startswith("basin-v") and f.endswith(".json"):
+                version = f[len("basin-v"):-len(".json")]
+                if self._version_num(version) is not None:
+                    versions.append(version)
+        return max(versions, key=self._version_num) if versions else None
+
     def load_latest_basin(self) -> Dict[str, Any]:
-        files = [f for f in os.listdir(self.OUTPUT_DIR) if f.startswith("basin-v") and f.endswith(".json")]
-        if not files:
+        if self._index_fresh():
+            latest = self.load_index().get("latest")
+            if self._version_num(latest) is not None:
+                data = self.load_basin(latest)
+                if data:
+                    return data
+
+        # No, unreadable or stale index: scan, then remember the result.
+        version = self._scan_latest_version()
+        if version is None:
             return {}
-        files.sort(key=lambda x: float(x.replace("basin-v", "").replace(".json", "")))
-        latest = files[-1]
-        version = latest.replace("basin-v", "").replace(".json", "")
+        self.update_index(version, force=True)
         return self.load_basin(version)
 
-    def compute_curvature(self, pts: List[Dict[str, Any]]) -> float:
-        if len(pts) < 3:
-            return 0.0
+    @staticmethod
+    def phase_xy(pts: List[Dict[str, Any]]):
+        n = len(pts)
+        xs = np.fromiter((p.get("x", 0) for p in pts), dtype=float, count=n)
+        ys = np.fromiter((p.get("y", 0) for p in pts), dtype=float, count=n)
+        return xs, ys
 
-        xs = np.array([p["x"] for p in pts])
-        ys = np.array([p["y"] for p in pts])
+    @staticmethod
+    def curvature_xy(xs, ys) -> float:
+        if len(xs) < 3:
+            return 0.0
 
         dx = np.diff(xs)
         dy = np.diff(ys)
@@ -65,13 +142,16 @@ class BasinEngine:
         ddx = np.diff(dx)
         ddy = np.diff(dy)
 
-        curvatures = []
-        for i in range(len(ddx)):
-            num = abs(dx[i] * ddy[i] - dy[i] * ddx[i])
-            den = (dx[i] ** 2 + dy[i] ** 2) ** 1.5 if (dx[i] ** 2 + dy[i] ** 2) > 0 else 1
-            curvatures.append(num / den)
+        dx = dx[:-1]
+        dy = dy[:-1]
+        speed2 = dx * dx + dy * dy
+        num = np.abs(dx * ddy - dy * ddx)
+        den = np.where(speed2 > 0, speed2 ** 1.5, 1.0)
+
+        return float(np.mean(num / den))
 
-        return float(np.mean(curvatures))
+    def compute_curvature(self, pts: List[Dict[str, Any]]) -> float:
+        return self.curvature_xy(*self.phase_xy(pts))
 
     def classify_basin(self, depth: float, width: float, curvature: float) -> str:
         if depth > 0.75 and width > 0.5:
@@ -89,7 +169,9 @@ class BasinEngine:
         if not pts:
             return {"error": "no phase data"}
 
-        curvature = round(self.compute_curvature(pts), 4)
+        # Extract the phase coordinates once; curvature and width share them.
+        xs, ys = self.phase_xy(pts)
+        curvature = round(self.curvature_xy(xs, ys), 4)
 
         coherence = field.get("coherence_index", 0)
         strength = 0
@@ -101,8 +183,6 @@ class BasinEngine:
 
         basin_depth = round(0.5 * coherence + 0.5 * strength, 4)
 
-        xs = [p.get("x", 0) for p in pts]
-        ys = [p.get("y", 0) for p in pts]
         basin_width = round(min(1, (np.std(xs) + np.std(ys))), 4)
 
         escape_energy = round(max(0, 1 - basin_depth + curvature), 4)
@@ -121,6 +201,7 @@ class BasinEngine:
         path = os.path.join(self.OUTPUT_DIR, f"basin-v{version}.json")
         with open(path, "w") as f:
             json.dump(out, f, indent=2)
+        self.update_index(version)
 
         out["path"] = path
         return out
@@ -1,36 +1,213 @@
 import os
 import json
-from datetime import datetime
+import time
+import hashlib
 from typing import Optional, List
 from pathlib import Path
 
-from backend.crypto.attestation import (
-    canonical_json,
-    sha256_hex,
-    sign_entry_hash,
-)
+from backend.crypto.attestation import sign_entry_hash
+from backend.fs_helpers import atomic_replace
+
+try:  # Optional C codec; the stdlib json paths below are the fallback.
+    import orjson
+except ImportError:
+    orjson = None
 
 
 BASE_DIR = Path(__file__).resolve().parent
-CMS_LOG_PATH = BASE_DIR / "cms-log.json"
+CMS_LOG_PATH = BASE_DIR / "cms-log.jsonl"
+CMS_HEAD_PATH = BASE_DIR / "cms-log.head"
 ORCH_LOG_PATH = BASE_DIR / "orchestration-log.json"
+ORCH_ARCHIVE_PATH = BASE_DIR / "orchestration-log.archive.jsonl"
+# Entries kept in orchestration-log.json; older ones spill to the archive.
+try:
+    ORCH_LOG_CAP = int(os.environ.get("TYME_ORCH_LOG_CAP") or 500)
+except ValueError:
+    ORCH_LOG_CAP = 500
+
+
+def _utc_timestamp() -> str:
+    """
+    ISO-8601 UTC timestamp (microsecond precision) without building a datetime.
+    """
+    secs, ns = divmod(time.time_ns(), 1_000_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(secs)) + f".{ns // 1000:06d}Z"
+
+
+# Parent directories already created/confirmed in this process.
+_SEEN_DIRS = set()
+
+
+def _ensure_parent(path):
+    # EAFP makedirs once per directory; later appends skip the syscalls.
+    d = path.parent
+    if d not in _SEEN_DIRS:
+        os.makedirs(d, exist_ok=True)
+        _SEEN_DIRS.add(d)
+
+
+def _dumps(obj, *, indent=False) -> bytes:
+    """UTF-8 JSON bytes; orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass  # e.g. non-str keys in caller-supplied meta
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def _loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 
 def _load_log(path):
     if not path.exists():
         return []
     try:
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        return _loads(path.read_bytes())
     except Exception:
         # If file is corrupt or empty, reset
         return []
 
 
 def _write_log(path, entries):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(entries, f, indent=2)
+    _ensure_parent(path)
+    with atomic_replace(path) as f:
+        f.write(_dumps(entries, indent=True))
+
+
+_NL = b"\n"
+
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = -1
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024  # Linux's limit; writev() rejects longer vectors with EINVAL
+
+
+def _write_all(fd, bufs):
+    """writev the buffers, at most _IOV_MAX per call, finishing any short write."""
+    for i in range(0, len(bufs), _IOV_MAX):
+        batch = bufs[i:i + _IOV_MAX]
+        total = sum(map(len, batch))
+        written = os.writev(fd, batch) if hasattr(os, "writev") else 0
+        if written < total:
+            # Short write (or no writev): flatten once and finish the rest.
+            view = memoryview(b"".join(batch))[written:]
+            while view:
+                view = view[os.write(fd, view):]
+
+
+def _append_jsonl_many(path, entries):
+    """
+    Append entries as JSONL with gather-writes on an O_APPEND fd: records and
+    their newlines go out as writev vectors of up to IOV_MAX buffers each.
+    Returns the file size after the append (None if there was nothing to write).
+    """
+    bufs = []
+    for entry in entries:
+        bufs.append(_dumps(entry))
+        bufs.append(_NL)
+    if not bufs:
+        return None
+    _ensure_parent(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_CLOEXEC", 0), 0o666)
+    try:
+        _write_all(fd, bufs)
+        return os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+
+
+def _append_jsonl(path, entry):
+    return _append_jsonl_many(path, [entry])
+
+
+def _last_log_line():
+    """Last non-empty line of cms-log.jsonl, read backwards from the end."""
+    try:
+        f = CMS_LOG_PATH.open("rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        while pos > 0:
+            step = min(65536, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            stripped = tail.rstrip()
+            cut = stripped.rfind(b"\n")
+            if cut >= 0:
+                return stripped[cut + 1:]
+        return tail.strip() or None
+
+
+def _read_chain_head():
+    """
+    Return the entry_hash of the last CMS event.
+
+    The sidecar records "<hash> <log size>". It is trusted only while the
+    log is still exactly that size; any other size (lines pulled in from
+    git, a truncated log) means it is stale and the head is re-read from
+    the log's last line instead.
+    """
+    try:
+        size = os.stat(CMS_LOG_PATH).st_size
+    except FileNotFoundError:
+        return None
+    try:
+        head, _, recorded = CMS_HEAD_PATH.read_text(encoding="utf-8").strip().partition(" ")
+        if head and recorded == str(size):
+            return head
+    except FileNotFoundError:
+        pass
+
+    last = _last_log_line()
+    if last is None:
+        return None
+    try:
+        return _loads(last).get("entry_hash")
+    except Exception:
+        return None
+
+
+def _hash_field(h, value):
+    if value is None:
+        h.update(b"-")
+        return
+    data = value.encode("utf-8")
+    h.update(b"%d:" % len(data))
+    h.update(data)
+
+
+def entry_hash_for(entry) -> str:
+    """
+    Deterministic SHA-256 of a CMS entry's chained fields.
+
+    The fields are fed to the hash in schema order, each length-prefixed
+    (None encodes as "-"), so the preimage is injective without a generic
+    sorted JSON encode. Verifiers must recompute hashes with this function.
+    """
+    h = hashlib.sha256()
+    _hash_field(h, entry["timestamp"])
+    _hash_field(h, entry["command"])
+    _hash_field(h, entry["mode"])
+    _hash_field(h, entry["summary"])
+    _hash_field(h, entry["commit_sha"])
+    files = entry["touched_files"]
+    h.update(b"%d|" % len(files))
+    for f in files:
+        _hash_field(h, f)
+    _hash_field(h, entry["prev_hash"])
+    return h.hexdigest()
+
+
+def _write_chain_head(entry_hash, log_size):
+    with atomic_replace(CMS_HEAD_PATH, text=True) as f:
+        f.write(f"{entry_hash} {log_size}")
 
 
 def log_cms_event(
@@ -42,18 +219,19 @@ def log_cms_event(
     touched_files: Optional[List[str]] = None,
 ):
     """
-    Append a CMS event to cms-log.json with:
+    Append a CMS event to cms-log.jsonl with:
     - hash chaining (tamper-evident)
     - optional Ed25519 signature (non-repudiation)
     - optional Git commit binding
-    """
 
-    entries = _load_log(CMS_LOG_PATH)
+    The chain head is kept in cms-log.head (untracked, validated against
+    the log's size) so an append never has to parse the existing log.
+    """
 
-    prev_hash = entries[-1].get("entry_hash") if entries else None
+    prev_hash = _read_chain_head()
 
     base_entry = {
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "timestamp": _utc_timestamp(),
         "command": command_text,
         "mode": mode,
         "summary": result_summary or "",
@@ -63,7 +241,7 @@ def log_cms_event(
     }
 
     # Compute deterministic entry hash (no signature fields included)
-    entry_hash = sha256_hex(canonical_json(base_entry))
+    entry_hash = entry_hash_for(base_entry)
 
     signature_b64 = None
     key_id = None
@@ -86,20 +264,53 @@ def log_cms_event(
         "key_id": key_id,
     }
 
-    entries.append(entry)
-    _write_log(CMS_LOG_PATH, entries)
+    log_size = _append_jsonl(CMS_LOG_PATH, entry)
+    _write_chain_head(entry_hash, log_size)
+
+
+
+# (st_mtime_ns, st_size) of orchestration-log.json -> its parsed entries, so a
+# long-running process re-parses the log only when someone else changed it.
+_ORCH_CACHE = None
+
+
+def _load_orch_log():
+    global _ORCH_CACHE
+    try:
+        st = os.stat(ORCH_LOG_PATH)
+    except FileNotFoundError:
+        return []
+    key = (st.st_mtime_ns, st.st_size)
+    if _ORCH_CACHE is None or _ORCH_CACHE[0] != key:
+        _ORCH_CACHE = (key, _load_log(ORCH_LOG_PATH))
+    # Shallow copy: callers append to it, entries themselves are not mutated.
+    return list(_ORCH_CACHE[1])
+
 
+def _save_orch_log(entries):
+    global _ORCH_CACHE
+    _write_log(ORCH_LOG_PATH, entries)
+    st = os.stat(ORCH_LOG_PATH)
+    _ORCH_CACHE = ((st.st_mtime_ns, st.st_size), list(entries))
 
 
 def log_orchestration_run(code: str, meta: dict | None = None):
     """
     Append an orchestration event to orchestration-log.json
     """
-    entries = _load_log(ORCH_LOG_PATH)
-    entry = {
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+    entries = _load_orch_log()
+    entries.append({
+        "timestamp": _utc_timestamp(),
         "code": code,
         "meta": meta or {}
-    }
-    entries.append(entry)
-    _write_log(ORCH_LOG_PATH, entries)
+    })
+
+    # Bound the hot file so each rewrite costs O(cap), not O(history).
+    # The overflow reaches the archive before the trimmed log replaces the
+    # old one, so a crash in between can duplicate entries but not lose them.
+    overflow = len(entries) - ORCH_LOG_CAP
+    if ORCH_LOG_CAP > 0 and overflow > 0:
+        _append_jsonl_many(ORCH_ARCHIVE_PATH, entries[:overflow])
+        entries = entries[overflow:]
+
+    _save_orch_log(entries)
@@ -3,10 +3,28 @@ import os
 import sys
 import re
 import json
+import math
+import hashlib
+import operator
+import stat
+import time
+import functools
+import shlex
 import subprocess
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    from backend.fs_helpers import PRUNE_DIRS, atomic_replace
+except ImportError:  # run as a script: python3 backend/cms_bindings.py
+    from fs_helpers import PRUNE_DIRS, atomic_replace
+
+try:  # Optional: C encoder for structured content; json is the fallback.
+    import orjson
+except ImportError:  # the CMS workflow only installs openai
+    orjson = None
 
 # =========================================================
 # TYME CMS — Sovereign UCE/UFW bindings
@@ -19,64 +37,92 @@ DRY_RUN = os.environ.get("TYME_DRY_RUN") == "1"
 # Shell + Git helpers
 # ----------------------------
 
-def sh(cmd: str, cwd: str = ".") -> str:
-    print(f"$ {cmd}")
+def sh(argv: List[str], cwd: str = ".", capture: bool = False) -> str:
+    """
+    Run a command. argv is exec'd directly (no /bin/sh in between, nothing
+    to quote). Output goes straight to our stdout (live in CI logs,
+    nothing buffered in memory) unless the caller needs it: capture=True.
+    """
+    cmd = shlex.join(argv)
+    print(f"$ {cmd}", flush=True)
     if DRY_RUN:
         return ""
     result = subprocess.run(
-        cmd,
-        shell=True,
+        argv,
         cwd=cwd,
         text=True,
-        stdout=subprocess.PIPE,
+        stdout=subprocess.PIPE if capture else None,
         stderr=subprocess.STDOUT,
     )
-    print(result.stdout)
     if result.returncode != 0:
+        if capture:
+            print(result.stdout)
         raise RuntimeError(f"Command failed: {cmd}")
-    return result.stdout
+    return result.stdout if capture else ""
 
 
-def ensure_git_identity() -> None:
-    def get_cfg(key: str) -> str:
-        return subprocess.run(
-            f"git config {key}",
-            shell=True,
+_GIT_CFG: Optional[Dict[str, str]] = None
+
+
+def _git_cfg_snapshot() -> Dict[str, str]:
+    # One `git config --list` per process instead of one probe per key.
+    global _GIT_CFG
+    if _GIT_CFG is None:
+        out = subprocess.run(
+            ["git", "config", "--list"],
+            cwd=REPO_ROOT,
             text=True,
             stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-        ).stdout.strip()
+            stderr=subprocess.DEVNULL,
+        ).stdout
+        _GIT_CFG = dict(line.split("=", 1) for line in out.splitlines() if "=" in line)
+    return _GIT_CFG
+
+
+def ensure_git_identity() -> None:
+    cfg = _git_cfg_snapshot()
+
+    if not cfg.get("user.name", "").strip():
+        sh(["git", "config", "user.name", "TYME CMS"])
+        cfg["user.name"] = "TYME CMS"
+    if not cfg.get("user.email", "").strip():
+        sh(["git", "config", "user.email", "tyme-cms@users.noreply.github.com"])
+        cfg["user.email"] = "tyme-cms@users.noreply.github.com"
 
-    if not get_cfg("user.name"):
-        sh('git config user.name "TYME CMS"')
-    if not get_cfg("user.email"):
-        sh('git config user.email "tyme-cms@users.noreply.github.com"')
+
+# Keep the summary to a single subject line; quoting is no longer a concern.
+_SUMMARY_UNSAFE_RE = re.compile(r"[\n\r\t]")
 
 
 def safe_commit(summary: str, touched_files: List[str]) -> None:
     ensure_git_identity()
 
-    summary = re.sub(r'["\n\r\t]', " ", (summary or "Tyme CMS update"))[:120]
+    summary = _SUMMARY_UNSAFE_RE.sub(" ", (summary or "Tyme CMS update"))[:120]
 
     if DRY_RUN:
         print("[DRY-RUN] Commit skipped")
         return
 
-    for f in touched_files:
-        sh(f'git add "{f}"')
-
-    status = subprocess.run(
-        "git status --porcelain",
-        shell=True,
-        text=True,
-        stdout=subprocess.PIPE,
-    ).stdout.strip()
-
-    if not status:
+    files = list(dict.fromkeys(touched_files))
+    if files:
+        # Paths go over stdin, NUL-separated: no ARG_MAX ceiling on big plans
+        # and no pathspec quoting issues, and still only the touched paths.
+        print(f"$ git add --pathspec-from-file=- ({len(files)} paths)")
+        result = subprocess.run(
+            ["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+            input="\0".join(files).encode("utf-8"),
+            cwd=REPO_ROOT,
+        )
+        if result.returncode != 0:
+            raise RuntimeError("Command failed: git add --pathspec-from-file=-")
+
+    # Exit code 0 means the index matches HEAD: nothing staged to commit.
+    staged = subprocess.run(["git", "diff", "--cached", "--quiet"], cwd=REPO_ROOT).returncode
+    if staged == 0:
         print("No changes detected; skipping commit.")
         return
 
-    sh(f'git commit -m "{summary}"')
+    sh(["git", "commit", "-m", summary])
 
 
 # ----------------------------
@@ -86,64 +132,143 @@ def safe_commit(summary: str, touched_files: List[str]) -> None:
 def normalize_rel_path(p: str) -> str:
     if not p:
         raise ValueError("Empty path")
+    return _normalize_rel_path(str(p))
 
-    p = str(p).strip().strip('"').strip("'")
-    p = p.lstrip("/").lstrip("./")
 
-    candidate = (REPO_ROOT / p).resolve()
-    if not str(candidate).startswith(str(REPO_ROOT)):
+@functools.lru_cache(maxsize=2048)
+def _normalize_rel_path(p: str) -> str:
+    # Pure apart from resolve(); cached so repeated targets within a plan
+    # skip the per-component lstat calls. Cleared at the start of main().
+    p = p.strip().strip('"').strip("'")
+    parts = [seg for seg in p.replace("\\", "/").split("/") if seg and seg != "."]
+    if ".." in parts:
         raise ValueError(f"Unsafe path (escapes repo): {p}")
+    if not parts:
+        raise ValueError("Empty path")
+    rel = "/".join(parts)
+
+    # Still resolve: a symlink inside the repo may point outside it.
+    candidate = (REPO_ROOT / rel).resolve()
+    if not candidate.is_relative_to(REPO_ROOT):
+        raise ValueError(f"Unsafe path (escapes repo): {p}")
+
+    return rel
 
-    return p.replace("\\", "/")
+
+# Directories known to exist during the current run_plan.
+_MKDIR_DONE: set = set()
+
+
+def _ensure_dir(path: Path) -> None:
+    if path in _MKDIR_DONE:
+        return
+    path.mkdir(parents=True, exist_ok=True)
+    _MKDIR_DONE.add(path)
+    # Every ancestor exists now as well, so siblings skip the mkdir entirely.
+    for d in path.parents:
+        if d in _MKDIR_DONE or d == REPO_ROOT:
+            break
+        _MKDIR_DONE.add(d)
+
+
+_ROOT_STR = str(REPO_ROOT)
+_DIR_OK: set = set()
+
+
+def assert_not_dir_file_collision(rel_path: str) -> None:
+    """
+    Raise NotADirectoryError if an existing file sits where one of rel_path's
+    parent directories would have to be created.
+    """
+    cur = _ROOT_STR
+    for seg in rel_path.split("/")[:-1]:
+        cur = cur + os.sep + seg
+        if cur in _DIR_OK:
+            continue
+        try:
+            st = os.lstat(cur)
+        except FileNotFoundError:
+            # Nothing deeper can exist, so nothing deeper can collide.
+            return
+        if stat.S_ISREG(st.st_mode):
+            raise NotADirectoryError(f"Path collision: '{cur}' is a file, cannot write '{rel_path}'")
+        _DIR_OK.add(cur)
 
 
 def ensure_parent_dirs(rel_path: str) -> None:
+    assert_not_dir_file_collision(rel_path)
     parent = (REPO_ROOT / rel_path).parent
     if not DRY_RUN:
-        parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(parent)
 
 
 # ----------------------------
 # Content normalization
 # ----------------------------
 
-def normalize_content(value: Any) -> str:
+def normalize_content(value: Any) -> Tuple[str, bool]:
+    """
+    Return (text, needs_newline). The trailing newline is written as a
+    separate buffer rather than concatenated, so large bodies aren't copied.
+    """
     if value is None:
-        return ""
+        return "", False
     if isinstance(value, str):
-        return value if value.endswith("\n") else value + "\n"
+        return value, not value.endswith("\n")
     try:
-        return json.dumps(value, ensure_ascii=False, indent=2, sort_keys=True) + "\n"
+        return json.dumps(value, ensure_ascii=False, indent=2, sort_keys=True), True
     except Exception:
-        return str(value) + "\n"
+        return str(value), True
 
 
 # ----------------------------
 # Robust JSON extraction
 # ----------------------------
 
-def extract_first_json_object(text: str) -> Dict[str, Any]:
-    if not text:
-        raise ValueError("Empty model output")
+_MD_FENCE_RE = re.compile(r"```(?:json)?", re.IGNORECASE)
+_JSON_DECODER = json.JSONDecoder()
+# Braces and (possibly unterminated) string literals, for skipping a span
+# that failed to decode.
+_BRACE_SCAN_RE = re.compile(r'"(?:[^"\\]|\\.)*"?|[{}]')
 
-    cleaned = re.sub(r"```(?:json)?", "", text, flags=re.IGNORECASE)
 
+def _brace_span_end(text: str, start: int) -> int:
+    """
+    Index just past the brace that closes the one at `start`, treating
+    braces inside strings as text; -1 if the object is never closed.
+    """
     depth = 0
-    start = None
-    for i, ch in enumerate(cleaned):
-        if ch == "{":
-            if depth == 0:
-                start = i
+    for m in _BRACE_SCAN_RE.finditer(text, start):
+        tok = m.group()
+        if tok == "{":
             depth += 1
-        elif ch == "}" and depth:
+        elif tok == "}":
             depth -= 1
-            if depth == 0 and start is not None:
-                try:
-                    obj = json.loads(cleaned[start : i + 1])
-                    if isinstance(obj, dict):
-                        return obj
-                except Exception:
-                    pass
+            if depth == 0:
+                return m.end()
+    return -1
+
+
+def extract_first_json_object(text: str) -> Dict[str, Any]:
+    if not text:
+        raise ValueError("Empty model output")
+
+    cleaned = _MD_FENCE_RE.sub("", text)
+
+    # A "{" that fails to decode is skipped whole, so a nested fragment of
+    # a truncated plan is never returned as the plan.
+    start = cleaned.find("{")
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(cleaned, start)
+        except json.JSONDecodeError:
+            obj = None
+        if isinstance(obj, dict):
+            return obj
+        end = _brace_span_end(cleaned, start)
+        if end == -1:
+            break
+        start = cleaned.find("{", end)
 
     raise ValueError("Could not extract valid JSON object")
 
@@ -153,45 +278,148 @@ def extract_first_json_object(text: str) -> Dict[str, Any]:
 # ----------------------------
 
 def now_utc_stamp() -> str:
-    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
 
 
-def slugify(s: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "-", s.lower()).strip("-")[:80] or "proposal"
+def utc_now_iso() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
 
 
-def directive_plan(raw: str) -> Optional[Dict[str, Any]]:
-    r = raw.strip().lower()
-
-    if r in {"refresh system index", "refresh index"}:
-        return {
-            "summary": "System index refresh",
-            "steps": [{
-                "op": "replace",
-                "file": "chronicle/system-index.json",
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def slugify(s: str) -> str:
+    return _SLUG_RE.sub("-", s.lower()).strip("-")[:80] or "proposal"
+
+
+_SCAN_WORKERS = 8
+
+
+def _walk_subtree(top: str, cut: int) -> Tuple[List[str], List[str]]:
+    """Walk one top-level directory; returns (directories, files) relative to the repo root."""
+    dirs: List[str] = []
+    files: List[str] = []
+    stack = [top]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.name in PRUNE_DIRS:
+                    continue
+                rel = entry.path[cut:].replace(os.sep, "/")
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    dirs.append(rel)
+                else:
+                    files.append(rel)
+    return dirs, files
+
+
+def scan_repo_index() -> Dict[str, Any]:
+    """
+    Snapshot of the repository layout for chronicle/system-index.json.
+    Top-level directories are walked in parallel; symlinks are not followed.
+    """
+    index: Dict[str, Any] = {
+        "generated_at": utc_now_iso(),
+        "directories": [],
+        "files": [],
+        "scrolls": [],
+        "forge_objects": [],
+        "backend_modules": [],
+        "frontend_assets": [],
+    }
+
+    # Top-level directory -> category list; one dict lookup per file.
+    buckets = {
+        "scrolls": index["scrolls"],
+        "forge": index["forge_objects"],
+        "backend": index["backend_modules"],
+        "frontend": index["frontend_assets"],
+        "public": index["frontend_assets"],
+        "assets": index["frontend_assets"],
+    }
+    directories = index["directories"]
+    files = index["files"]
+
+    root = str(REPO_ROOT)
+    cut = len(root) + 1
+    top_dirs: List[str] = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.name in PRUNE_DIRS:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                top_dirs.append(entry.path)
+                directories.append(entry.name)
+            else:
+                files.append(entry.name)
+
+    with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as ex:
+        for top, (sub_dirs, sub_files) in zip(top_dirs, ex.map(_walk_subtree, top_dirs, [cut] * len(top_dirs))):
+            directories.extend(sub_dirs)
+            files.extend(sub_files)
+            bucket = buckets.get(top[cut:])
+            if bucket is not None:
+                bucket.extend(sub_files)
+
+    for value in index.values():
+        if isinstance(value, list):
+            value.sort()
+    return index
+
+
+_REFRESH_PHRASES = {"refresh system index", "refresh index"}
+_DIRECTIVE_KEY_RE = re.compile(r"[A-Za-z]+")
+
+
+def _handle_refresh(text: str) -> Optional[Dict[str, Any]]:
+    if text.lower() not in _REFRESH_PHRASES:
+        return None
+    return {
+        "summary": "System index refresh",
+        "steps": [{
+            "op": "replace",
+            "file": "chronicle/system-index.json",
+            "mode": "overwrite",
+            "content": scan_repo_index(),
+        }],
+    }
+
+
+def _handle_proposal(text: str) -> Optional[Dict[str, Any]]:
+    if text[8:9] != ":":
+        return None
+    body = text[9:].strip()
+    ts = now_utc_stamp()
+    title, _, content = body.partition("::")
+    return {
+        "summary": f"Proposal: {title.strip()}",
+        "steps": [
+            {"op": "mkdir", "file": "proposals"},
+            {
+                "op": "create",
+                "file": f"proposals/{ts}_{slugify(title)}.md",
                 "mode": "overwrite",
-                "content": scan_repo_index(),
-            }],
-        }
-
-    if r.startswith("proposal:"):
-        body = raw.split(":", 1)[1].strip()
-        ts = now_utc_stamp()
-        title, _, content = body.partition("::")
-        return {
-            "summary": f"Proposal: {title.strip()}",
-            "steps": [
-                {"op": "mkdir", "file": "proposals"},
-                {
-                    "op": "create",
-                    "file": f"proposals/{ts}_{slugify(title)}.md",
-                    "mode": "overwrite",
-                    "content": f"# {title.strip()}\n\nCreated: {ts}\n\n{content.strip()}",
-                },
-            ],
-        }
+                "content": f"# {title.strip()}\n\nCreated: {ts}\n\n{content.strip()}",
+            },
+        ],
+    }
 
-    return None
+
+# Leading word -> handler. Only that word is lowercased, never the whole payload.
+_DIRECTIVES = {
+    "refresh": _handle_refresh,
+    "proposal": _handle_proposal,
+}
+
+
+def directive_plan(raw: str) -> Optional[Dict[str, Any]]:
+    text = raw.strip()
+    m = _DIRECTIVE_KEY_RE.match(text)
+    if not m:
+        return None
+    fn = _DIRECTIVES.get(m.group().lower())
+    return fn(text) if fn else None
 
 
 # ----------------------------
@@ -208,71 +436,634 @@ OP_ALIASES = {
     "remove": "delete",
 }
 
+# Every accepted spelling (canonical or alias) -> interned canonical op.
+_OP_CANON = {k: sys.intern(v) for k, v in {**{op: op for op in ALLOWED_OPS}, **OP_ALIASES}.items()}
+
+
 def canonical_op(op: str) -> str:
-    return OP_ALIASES.get((op or "").lower(), (op or "").lower())
+    """Canonical op name, or "" when the op is not recognised."""
+    return _OP_CANON.get(op.lower() if op else "", "")
 
 
-def validate_step(step: Dict[str, Any]) -> None:
+def validate_step(step: Dict[str, Any]) -> str:
+    """Validate a plan step and return its canonical op."""
     if "op" not in step or "file" not in step:
         raise ValueError(f"Invalid step: {step}")
-    if canonical_op(step["op"]) not in ALLOWED_OPS:
+    op = canonical_op(step["op"])
+    if not op:
         raise ValueError(f"Unknown operation: {step['op']}")
+    return op
 
 
-def apply_step(step: Dict[str, Any], touched: List[str]) -> None:
-    validate_step(step)
+def _write_chunks(fd: int, chunks: List[bytes]) -> None:
+    written = os.writev(fd, chunks) if hasattr(os, "writev") else 0
+    if written < sum(map(len, chunks)):
+        # Short write (or no writev): finish with plain writes.
+        view = memoryview(b"".join(chunks))[written:]
+        while view:
+            view = view[os.write(fd, view):]
 
-    op = canonical_op(step["op"])
-    path = normalize_rel_path(step["file"])
-    content = normalize_content(step.get("content"))
 
-    print(f"STEP: {op} {path}")
+def write_file(full: str, chunks: List[bytes], append: bool = False) -> None:
+    """writev the encoded chunks; overwrites are atomic replaces."""
+    if not append:
+        with atomic_replace(full) as f:
+            _write_chunks(f.fileno(), chunks)
+        return
+    fd = os.open(full, os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_CLOEXEC", 0), 0o666)
+    try:
+        _write_chunks(fd, chunks)
+    finally:
+        os.close(fd)
+
+
+# Same layout as the json.dump fallback below; float spelling may differ.
+_ORJSON_OPTS = (
+    orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+    if orjson is not None else 0
+)
+
+
+def write_json(full: str, value: Any, append: bool = False) -> None:
+    """Write `value` as indented JSON: orjson bytes if available, else json.dump."""
+    if orjson is not None:
+        try:
+            data = orjson.dumps(value, option=_ORJSON_OPTS)
+        except (orjson.JSONEncodeError, TypeError):
+            data = None  # e.g. ints beyond 64 bits; json handles those
+        if data is not None:
+            write_file(full, [data], append=append)
+            return
+
+    if append:
+        with open(full, "a", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        return
+
+    with atomic_replace(full, text=True) as f:
+        json.dump(value, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
 
+def _apply_prepared(op: str, path: str, value: Any, touched: List[str]) -> None:
+    """Execute one step whose op is canonical and whose path is normalised."""
     if op == "mkdir":
         if not DRY_RUN:
-            (REPO_ROOT / path).mkdir(parents=True, exist_ok=True)
+            _ensure_dir(REPO_ROOT / path)
         return
 
-    full = REPO_ROOT / path
+    # Plain string join: the syscalls below take str, so no Path per step.
+    full = _ROOT_STR + os.sep + path
 
     if op == "delete":
-        if full.exists() and full.is_file():
+        # Only regular files are deleted; a missing path, a directory or a
+        # symlink to one is a no-op.
+        if os.path.isfile(full):
             if not DRY_RUN:
-                full.unlink()
+                try:
+                    os.unlink(full)
+                except (FileNotFoundError, NotADirectoryError):
+                    return
             touched.append(path)
         return
 
     ensure_parent_dirs(path)
 
-    mode = "a" if op == "patch" else "w"
     if not DRY_RUN:
-        with full.open(mode, encoding="utf-8") as f:
-            f.write(content)
+        if isinstance(value, (dict, list)):
+            write_json(full, value, append=(op == "patch"))
+        else:
+            content, needs_newline = normalize_content(value)
+            chunks = [content.encode("utf-8"), b"\n"] if needs_newline else [content.encode("utf-8")]
+            write_file(full, chunks, append=(op == "patch"))
     touched.append(path)
 
 
+_TEXT_WRITE_OPS = {"create", "replace", "patch"}
+_WRITE_WORKERS = 8
+
+
+class PreparedStep(NamedTuple):
+    """A validated plan step: canonical op, normalised path, content."""
+    op: str
+    path: str
+    content: Any
+
+
+def prepare_steps(steps: List[Dict[str, Any]]) -> List[PreparedStep]:
+    """
+    Validate and normalise every step up front, folding consecutive text
+    writes to the same file into one step.
+    """
+    out: List[PreparedStep] = []
+    runs: Dict[int, List[str]] = {}  # index in `out` -> text pieces of that run
+    for step in steps:
+        op = validate_step(step)
+        path = normalize_rel_path(step["file"])
+        value = step.get("content")
+        if op not in _TEXT_WRITE_OPS or isinstance(value, (dict, list)):
+            out.append(PreparedStep(op, path, value))
+            continue
+
+        text, needs_newline = normalize_content(value)
+        piece = text + "\n" if needs_newline else text
+        last = len(out) - 1
+        if last in runs and out[last].path == path:
+            if op == "patch":
+                runs[last].append(piece)
+            else:
+                runs[last] = [piece]
+                out[last] = PreparedStep(op, path, None)
+            continue
+
+        runs[len(out)] = [piece]
+        out.append(PreparedStep(op, path, None))
+
+    for i, parts in runs.items():
+        out[i] = out[i]._replace(content="".join(parts) or None)
+    return out
+
+
+def _steps_independent(prepared: List[PreparedStep]) -> bool:
+    """True if only text writes, to distinct paths, none inside another."""
+    paths = set()
+    for p in prepared:
+        if p.op not in _TEXT_WRITE_OPS or p.path in paths:
+            return False
+        paths.add(p.path)
+    for path in paths:
+        cut = path.rfind("/")
+        while cut > 0:
+            if path[:cut] in paths:
+                return False
+            cut = path.rfind("/", 0, cut)
+    return True
+
+
 def run_plan(plan: Dict[str, Any]) -> None:
     steps = plan.get("steps") or []
     summary = plan.get("summary", "Tyme CMS update")
 
+    _MKDIR_DONE.clear()
+    _DIR_OK.clear()
     touched: List[str] = []
-    for step in steps:
-        apply_step(step, touched)
+    prepared = prepare_steps(steps)
+
+    # One write for the whole step listing rather than a print per step
+    # (which would also interleave once steps run on the pool below).
+    if prepared:
+        sys.stdout.write("".join(f"STEP: {p.op} {p.path}\n" for p in prepared))
+        sys.stdout.flush()
+
+    if len(prepared) > 2 and _steps_independent(prepared):
+        # Order can't matter, so overlap the writes; per-step lists keep
+        # `touched` in plan order.
+        def _apply(prep: PreparedStep) -> List[str]:
+            out: List[str] = []
+            _apply_prepared(*prep, out)
+            return out
+
+        with ThreadPoolExecutor(max_workers=min(_WRITE_WORKERS, len(prepared))) as ex:
+            for out in ex.map(_apply, prepared):
+                touched.extend(out)
+    else:
+        for prep in prepared:
+            _apply_prepared(*prep, touched)
 
     safe_commit(summary, touched)
 
 
+# ----------------------------
+# CMS Interpreter
+# ----------------------------
+
+# Lives in its own module; re-exported for callers of cms_bindings.execute.
+try:
+    from backend.cms_interpreter import CMSExecutionResult, CMSParseResult, execute  # noqa: F401
+except ImportError:  # run as a script: python3 backend/cms_bindings.py
+    from cms_interpreter import CMSExecutionResult, CMSParseResult, execute  # noqa: F401
+
+
 # ----------------------------
 # Main
 # ----------------------------
 
+# Unwraps `cms("...")`-style calls down to the instruction text.
+_CALL_WRAP_RE = re.compile(r"^[a-zA-Z_]\w*\((.*)\)$", re.DOTALL)
+
+
 def clean_user_input(raw: str) -> str:
     raw = raw.strip()
-    m = re.match(r"^[a-zA-Z_]\w*$begin:math:text$(.*)$end:math:text$$", raw)
+    m = _CALL_WRAP_RE.match(raw)
     return m.group(1).strip() if m else raw
 
 
+# Static so the API's prompt caching can reuse it; keep per-run values out.
+SYSTEM_PROMPT = """
+You are TYME CMS, the repository editor for Tyme-open.
+Translate the user's instruction into a plan and reply with a single JSON object only.
+Do not add prose, Markdown fences, or comments around the object.
+
+Plan format:
+{
+  "summary": "<one-line commit summary>",
+  "steps": [
+    {"op": "create|replace|patch|delete|mkdir", "file": "<repo-relative path>", "mode": "overwrite|append", "content": "<file content>"}
+  ]
+}
+
+Fields:
+- "summary" becomes the git commit subject. One line, imperative mood, under
+  72 characters, no trailing period. Describe what changes, not how.
+- "steps" run in order. Every step needs "op" and "file"; set "mode" and
+  "content" to null when they do not apply.
+- "mode" is informational only; the op alone decides whether a write
+  overwrites or appends. Use "overwrite" for create/replace, "append" for
+  patch, and null for delete/mkdir.
+- "content" is the literal text written to the file. A trailing newline is
+  added if it is missing. Use null for delete and mkdir.
+
+Operations:
+- "create": write a new file with the full content. If the file already
+  exists it is overwritten, so only use it for files that should not exist.
+- "replace": overwrite an existing file with its complete new content.
+  There is no partial or line-level edit: always send the whole file.
+- "patch": append content to the end of a file, creating it if needed.
+  Use it for logs, changelogs, and adding sections at the end of a document.
+- "delete": remove a single file. Deleting a missing file is a no-op.
+  Directories cannot be deleted.
+- "mkdir": create a directory (and its parents). Parent directories of any
+  written file are created automatically, so mkdir is only needed for an
+  otherwise empty directory.
+
+The executor also accepts these aliases, but always emit the canonical op:
+  overwrite -> replace, write -> replace, append -> patch,
+  update -> patch, add -> create, remove -> delete.
+
+Consecutive writes to the same file are merged: a create/replace discards
+earlier writes to that file, and later patches append to it. Prefer one
+complete write per file over a write followed by patches.
+
+Paths:
+- Paths are relative to the repository root and use forward slashes.
+- Never use "..", absolute paths, drive letters, or anything under .git/.
+- Never write through a path whose parent is an existing file.
+- Keep the existing layout: HTML scroll pages live in scrolls/, Python
+  backend modules in backend/, documentation in docs/, proposals in
+  proposals/, governance documents in governance/, and Codex policies and
+  schemas under codex/.
+- Do not edit generated logs or state (backend/chronicle/*.json,
+  backend/chronicle/*.jsonl, backend/state/) unless explicitly asked.
+
+Content:
+- Write complete, working file contents. No placeholders such as "...",
+  "TODO: fill in", or "rest of file unchanged".
+- Match the style of the surrounding files: indentation, quoting, headings.
+- Markdown files start with a single "# Title" heading.
+- JSON file contents must be valid JSON, serialised as a string.
+- Keep secrets, tokens, and credentials out of every file.
+
+Instructions:
+- The instruction is plain English, sometimes with a CMS-style prefix such
+  as "tyme." or "avot."; treat the prefix as context, not as a command.
+- Quoted text in the instruction is literal: copy it exactly into content.
+- When the instruction names a file without a directory, look for the
+  conventional location above before creating a new top-level file.
+- When the instruction is ambiguous, choose the smallest reasonable change
+  and say what was chosen in "summary".
+
+Scope:
+- Use the fewest steps that fulfil the instruction.
+- Only touch files the instruction asks for or directly implies.
+- If the instruction cannot be carried out safely within these rules,
+  return an empty "steps" list and explain why in "summary".
+
+Examples:
+
+Instruction: create a README for the lessons folder explaining what it holds
+{"summary": "Add README for docs/lessons", "steps": [
+  {"op": "create", "file": "docs/lessons/README.md", "mode": "overwrite",
+   "content": "# Lessons\\n\\nShort write-ups of what each epoch taught the project.\\n"}
+]}
+
+Instruction: add a note to the maintenance tasks that the index is refreshed weekly
+{"summary": "Note weekly index refresh in maintenance tasks", "steps": [
+  {"op": "patch", "file": "docs/maintenance_tasks.md", "mode": "append",
+   "content": "\\n- The system index is refreshed weekly.\\n"}
+]}
+
+Instruction: remove the old example doc and make an empty drafts directory
+{"summary": "Remove example doc and add drafts directory", "steps": [
+  {"op": "delete", "file": "docs/example.md", "mode": null, "content": null},
+  {"op": "mkdir", "file": "docs/drafts", "mode": null, "content": null}
+]}
+
+Instruction: replace the settings scroll title with "Tyme Settings"
+{"summary": "Retitle the settings scroll", "steps": [
+  {"op": "replace", "file": "scrolls/settings.html", "mode": "overwrite",
+   "content": "<the complete updated contents of scrolls/settings.html>"}
+]}
+(The angle-bracket text stands for the real, complete file contents.)
+
+Instruction: write a proposal for a nightly drift report
+{"summary": "Propose a nightly drift report", "steps": [
+  {"op": "create", "file": "proposals/nightly-drift-report.md", "mode": "overwrite",
+   "content": "# Nightly drift report\\n\\n## Motivation\\n\\nSurface coherence drift before it compounds.\\n\\n## Plan\\n\\n- Run the drift monitor nightly.\\n- Append a summary to the chronicle.\\n"}
+]}
+
+Instruction: delete /etc/passwd
+{"summary": "Refused: path is outside the repository", "steps": []}
+""".strip()
+
+# Structured-outputs schema for the plan. Strict mode needs every key listed
+# as required, so optional fields are nullable instead.
+PLAN_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "steps": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "op": {"type": "string", "enum": sorted(ALLOWED_OPS)},
+                    "file": {"type": "string"},
+                    "mode": {"type": ["string", "null"], "enum": ["overwrite", "append", None]},
+                    "content": {"type": ["string", "null"]},
+                },
+                "required": ["op", "file", "mode", "content"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["summary", "steps"],
+    "additionalProperties": False,
+}
+
+_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "plan", "schema": PLAN_SCHEMA, "strict": True},
+}
+# Tried in order when an endpoint rejects the previous one (HTTP 400);
+# None sends no response_format at all.
+_FALLBACK_FORMATS = ({"type": "json_object"}, None)
+
+# Built once: every request starts with this identical message, which is
+# the stable prefix OpenAI's automatic prompt caching keys on.
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+
+def _env_number(name: str, default, cast):
+    """Numeric setting from the environment; unset or malformed -> default."""
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        print(f"[WARN] Ignoring {name}={raw!r}; using {default}.")
+        return default
+
+
+# Read once at import; each run is its own process.
+PLAN_MAX_TOKENS = _env_number("TYME_PLAN_MAX_TOKENS", 8192, int)
+PLAN_MODEL = os.environ.get("TYME_MODEL", "gpt-4o-mini")
+PLAN_SEED = _env_number("TYME_SEED", 42, int)
+
+_CLIENT = None
+# Per-request network timeout (seconds); the SDK default is ten minutes.
+OPENAI_TIMEOUT = _env_number("TYME_OPENAI_TIMEOUT", 30.0, float)
+
+
+def _openai_client():
+    # Lazily built once per process so every request shares one
+    # httpx connection pool (and its TLS session).
+    global _CLIENT
+    if _CLIENT is None:
+        from openai import OpenAI
+        _CLIENT = OpenAI(api_key=os.environ["OPENAI_API_KEY"], timeout=OPENAI_TIMEOUT)
+    return _CLIENT
+
+
+# ----------------------------
+# Plan cache
+# ----------------------------
+
+# Content-addressed plans, so a re-issued instruction (retry, scheduled run)
+# skips the model call. Opt-in: TYME_CACHE=1; TYME_CACHE_TTL in seconds.
+PLAN_CACHE_DIR = REPO_ROOT / ".tyme_cache" / "plans"
+
+
+def plan_cache_enabled() -> bool:
+    return os.environ.get("TYME_CACHE") == "1"
+
+
+# The prompt is fixed per build, so hash it once rather than re-encoding
+# several KB of it into every cache key.
+_SYSTEM_PROMPT_DIGEST = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()
+
+
+def plan_cache_key(model: str, cleaned: str) -> str:
+    return hashlib.sha256(f"{model}\0{_SYSTEM_PROMPT_DIGEST}\0{cleaned}".encode("utf-8")).hexdigest()
+
+
+def load_cached_plan(key: str) -> Optional[Dict[str, Any]]:
+    path = PLAN_CACHE_DIR / f"{key}.json"
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    ttl = float(os.environ.get("TYME_CACHE_TTL") or 0)
+    if ttl > 0 and time.time() - st.st_mtime > ttl:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return plan if isinstance(plan, dict) else None
+
+
+def store_cached_plan(key: str, plan: Dict[str, Any]) -> None:
+    PLAN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with atomic_replace(PLAN_CACHE_DIR / f"{key}.json", text=True) as f:
+        json.dump(plan, f, ensure_ascii=False)
+
+
+# Near-duplicate layer (TYME_SEMANTIC_CACHE=1): unit float32 embeddings in
+# one flat file, keys.jsonl mapping each row to its exact-cache plan key.
+EMBED_MODEL = "text-embedding-3-small"
+EMBED_PATH = REPO_ROOT / ".tyme_cache" / "embeddings.f32"
+EMBED_KEYS_PATH = REPO_ROOT / ".tyme_cache" / "keys.jsonl"
+SEMANTIC_MIN_SIMILARITY = 0.95
+# Only the most recent rows are compared; the scan is pure Python.
+SEMANTIC_MAX_ENTRIES = 512
+
+
+def semantic_cache_enabled() -> bool:
+    return plan_cache_enabled() and os.environ.get("TYME_SEMANTIC_CACHE") == "1"
+
+
+def embed_instruction(client, cleaned: str) -> array:
+    resp = client.embeddings.create(model=EMBED_MODEL, input=cleaned)
+    vec = resp.data[0].embedding
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return array("f", (x / norm for x in vec))
+
+
+# Quoted literals, path-like tokens (a.md, docs/a.md) and bare numbers.
+_LITERAL_RE = re.compile(
+    r'"[^"]*"|`[^`]*`'
+    r"|(?<!\w)'[^']*'(?!\w)"
+    r"|[\w-]*[./\\][\w./\\-]*\w|\d+"
+)
+# Words that pick the plan's ops.
+_OP_VERB_RE = re.compile(
+    r"\b(?:create|add|make|new|write|replace|overwrite|update|edit|change|set"
+    r"|patch|append|insert|delete|remove|drop|clear|empty|rename|move|mkdir)\b",
+    re.IGNORECASE,
+)
+
+
+def instruction_signature(cleaned: str) -> Tuple[List[str], List[str]]:
+    """Literals and op verbs, which embeddings barely distinguish."""
+    literals = sorted(m.group() for m in _LITERAL_RE.finditer(cleaned))
+    verbs = sorted(m.group().lower() for m in _OP_VERB_RE.finditer(cleaned))
+    return literals, verbs
+
+
+def semantic_lookup(vec: array, cleaned: str) -> Optional[str]:
+    """Plan key of the closest recent instruction with the same signature."""
+    dim = len(vec)
+    try:
+        with open(EMBED_KEYS_PATH, "r", encoding="utf-8") as f:
+            rows_meta = [json.loads(line) for line in f if line.strip()]
+        # A crash between the two appends can leave one file a row ahead.
+        rows = min(len(rows_meta), os.path.getsize(EMBED_PATH) // (dim * 4))
+        start = max(0, rows - SEMANTIC_MAX_ENTRIES)
+        signature = instruction_signature(cleaned)
+        candidates = [
+            (i, rows_meta[i]["key"]) for i in range(start, rows)
+            if instruction_signature(rows_meta[i]["cleaned"]) == signature
+        ]
+        if not candidates:
+            return None
+        matrix = array("f")
+        with open(EMBED_PATH, "rb") as f:
+            f.seek(start * dim * 4)
+            matrix.frombytes(f.read((rows - start) * dim * 4))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    best, best_key = SEMANTIC_MIN_SIMILARITY, None
+    for i, key in candidates:
+        off = (i - start) * dim
+        # Rows are unit vectors, so the dot product is the cosine similarity.
+        sim = sum(map(operator.mul, vec, matrix[off:off + dim]))
+        if sim >= best:
+            best, best_key = sim, key
+    return best_key
+
+
+def semantic_store(vec: array, cleaned: str, key: str) -> None:
+    EMBED_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(EMBED_PATH, "ab") as f:
+        vec.tofile(f)
+    with open(EMBED_KEYS_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"cleaned": cleaned, "key": key}, ensure_ascii=False) + "\n")
+
+
+def parse_inline_plan(text: str) -> Optional[Dict[str, Any]]:
+    """The instruction itself as a plan, if it is a JSON object with a steps list."""
+    try:
+        plan = orjson.loads(text) if orjson is not None else json.loads(text)
+    except ValueError:  # orjson.JSONDecodeError subclasses it too
+        return None
+    if isinstance(plan, dict) and isinstance(plan.get("steps"), list):
+        return plan
+    return None
+
+
+def request_plan_text(client, model: str, cleaned: str, response_format=_RESPONSE_FORMAT) -> str:
+    """
+    Stream the plan from the model. Deltas are echoed as they arrive (live
+    progress in CI logs) and joined once at the end.
+    """
+    extra = {"response_format": response_format} if response_format else {}
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[_SYSTEM_MESSAGE, {"role": "user", "content": cleaned}],
+        # Deterministic sampling so a repeated instruction yields the same
+        # plan bytes (and the plan cache stays coherent); bounded output.
+        temperature=0,
+        seed=PLAN_SEED,
+        max_tokens=PLAN_MAX_TOKENS,
+        stream=True,
+        # Final chunk carries token usage, including prompt-cache hits.
+        stream_options={"include_usage": True},
+        **extra,
+    )
+
+    parts: List[str] = []
+    refusal: List[str] = []
+    finish_reason = None
+    usage = None
+    for event in stream:
+        if not event.choices:
+            usage = getattr(event, "usage", None) or usage
+            continue
+        choice = event.choices[0]
+        delta = choice.delta
+        if delta.content:
+            parts.append(delta.content)
+            sys.stdout.write(delta.content)
+            sys.stdout.flush()
+        if getattr(delta, "refusal", None):
+            refusal.append(delta.refusal)
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+    if parts:
+        sys.stdout.write("\n")
+    if usage is not None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        print(f"Prompt tokens: {usage.prompt_tokens} (cached: {cached})")
+
+    if finish_reason == "length":
+        raise RuntimeError(
+            f"Plan exceeded {PLAN_MAX_TOKENS} tokens and was truncated (raise TYME_PLAN_MAX_TOKENS)"
+        )
+    if not parts:
+        raise RuntimeError(f"Model returned no plan: {''.join(refusal) or 'empty response'}")
+    return "".join(parts)
+
+
+def request_plan(client, model: str, cleaned: str) -> Dict[str, Any]:
+    """Structured output, falling back to json_object / plain text + extraction."""
+    try:
+        text = request_plan_text(client, model, cleaned)
+        return orjson.loads(text) if orjson is not None else json.loads(text)
+    except Exception as e:
+        if getattr(e, "status_code", None) != 400:
+            raise
+        err = e
+    for fmt in _FALLBACK_FORMATS:
+        print(f"[WARN] response_format rejected ({err}); retrying with {fmt or 'plain text'}")
+        try:
+            text = request_plan_text(client, model, cleaned, fmt)
+        except Exception as e:
+            if getattr(e, "status_code", None) != 400:
+                raise
+            err = e
+            continue
+        return extract_first_json_object(text)
+    raise err
+
+
 def main() -> None:
+    _normalize_rel_path.cache_clear()
+
     raw = " ".join(sys.argv[1:]).strip()
     if not raw:
         print("No command provided.")
@@ -283,17 +1074,43 @@ def main() -> None:
         run_plan(dplan)
         return
 
-    from openai import OpenAI
-    client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-    resp = client.chat.completions.create(
-        model=os.environ.get("TYME_MODEL", "gpt-4o-mini"),
-        messages=[{"role": "system", "content": SYSTEM_PROMPT},
-                  {"role": "user", "content": clean_user_input(raw)}],
-        temperature=0.2,
-    )
-
-    plan = extract_first_json_object(resp.choices[0].message.content or "")
+    # A pre-formed plan needs no model round-trip.
+    if raw.startswith("{"):
+        plan = parse_inline_plan(raw)
+        if plan is not None:
+            print("Inline plan: skipping model call.")
+            run_plan(plan)
+            return
+
+    model = PLAN_MODEL
+    cleaned = clean_user_input(raw)
+    cache_key = plan_cache_key(model, cleaned) if plan_cache_enabled() else None
+    if cache_key:
+        cached = load_cached_plan(cache_key)
+        if cached is not None:
+            print(f"Plan cache hit: {cache_key[:12]}")
+            run_plan(cached)
+            return
+
+    client = _openai_client()
+    vec = None
+    if cache_key and semantic_cache_enabled():
+        vec = embed_instruction(client, cleaned)
+        near_key = semantic_lookup(vec, cleaned)
+        cached = load_cached_plan(near_key) if near_key else None
+        if cached is not None:
+            print(f"Semantic cache hit: {near_key[:12]}")
+            run_plan(cached)
+            return
+
+    plan = request_plan(client, model, cleaned)
     run_plan(plan)
+    # Only plans that executed cleanly are worth replaying; a dry run
+    # executed nothing, so it writes no cache either.
+    if cache_key and not DRY_RUN:
+        store_cached_plan(cache_key, plan)
+        if vec is not None:
+            semantic_store(vec, cleaned, cache_key)
 
 
 if __name__ == "__main__":
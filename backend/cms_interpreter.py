@@ -0,0 +1,175 @@
+# backend/cms_interpreter.py
+# CMS shorthand and natural-language commands -> CMSParseResult -> engines.
+# Reached through cms_bindings.execute (backend/main.py, AVOT-Tyme).
+import ast
+import functools
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+CMS_NAMESPACES = {"tyme", "avot", "epoch", "rhythm", "evolve", "orchestrate"}
+EPOCH_NAMES = "initiation|coherence|ascent|convergence|harmonic|reverie|continuum"
+
+_SHORTHAND_RE = re.compile(r"^([a-zA-Z_]\w*(?:\.[a-zA-Z_]\w*)+)\s*\((.*)\)$", re.DOTALL)
+
+# Typographic quotes pasted from chat/docs -> ASCII, in one C-level pass.
+_QUOTE_TBL = str.maketrans({"\u201c": '"', "\u201d": '"', "\u2018": "'", "\u2019": "'"})
+
+# Explanatory phrase -> shorthand template (see docs/CMS-COMMANDS.md).
+# Each pattern must match the whole (lowercased, trailing-period-stripped)
+# input, so a documented command word inside ordinary chat ("the guardian
+# said hi") never triggers an action. Only phrasings whose shorthand
+# orchestrate_from_cms actually handles are listed.
+_NL_RULES = [
+    (re.compile(rf"shift tyme into epoch:? ?({EPOCH_NAMES})"), 'epoch.set("{}")'),
+    (re.compile(rf"enter the ({EPOCH_NAMES}) epoch"), 'epoch.set("{}")'),
+    (re.compile(r"show (?:me )?the current epoch(?: parameters)?"), "epoch.get()"),
+    (re.compile(r"tune the rhythm engine to mode (\d+)"), "rhythm.set({})"),
+    (re.compile(r"awaken tyme|initiali[sz]e the orchestration engine"), "tyme.init()"),
+    (re.compile(r"run the full (\d+)-cycle (?:harmonic|orchestration) pulse(?: of tyme)?"), "tyme.orchestrate({})"),
+    (re.compile(r"run cycle (c\d{2})"), 'tyme.cycle("{}")'),
+    (re.compile(r"show (?:me )?tyme's last evolution trace"), "tyme.last()"),
+    (re.compile(r"initiate the next evolution sequence"), "evolve.next()"),
+    (re.compile(r"expand the avot lattice"), 'evolve.expand("avot")'),
+    (re.compile(r"call (?:the )?fabricator to draft .+"), "avot.fabricator.draft()"),
+    (re.compile(r"summon (?:the )?guardian(?: to .+)?"), "avot.guardian.check()"),
+    (re.compile(r"activate (?:the )?convergence(?: to .+)?"), "avot.convergence.unify()"),
+    (re.compile(r"invite (?:the )?archivist(?: to .+)?"), "avot.archivist.update()"),
+    (re.compile(r"request a resonance map from harmonia"), "avot.harmonia.map()"),
+    (re.compile(r"guide a new initiate through the onboarding path"), "avot.initiate.path()"),
+]
+
+
+@dataclass(frozen=True, slots=True)
+class CMSParseResult:
+    ns: str
+    name: Optional[str]
+    action: str
+    args: Tuple[Any, ...]
+    kwargs: Tuple[Tuple[str, Any], ...]
+    origin: str
+    raw: str
+    canonical: str
+
+
+@dataclass(slots=True)
+class CMSExecutionResult:
+    mode: str
+    canonical: Optional[str]
+    parsed: Optional[CMSParseResult]
+    result: Any = None
+    error: Optional[str] = None
+    notes: Dict[str, Any] = field(default_factory=dict)
+
+
+def parse_shorthand(text: str, origin: str = "shorthand") -> Optional[CMSParseResult]:
+    m = _SHORTHAND_RE.match(text.strip())
+    if not m:
+        return None
+
+    path = m.group(1).lower().split(".")
+    if path[0] not in CMS_NAMESPACES:
+        return None
+    if path[0] == "avot" and len(path) != 3:
+        return None
+
+    try:
+        call = ast.parse(f"_({m.group(2).translate(_QUOTE_TBL)})", mode="eval").body
+        if not isinstance(call, ast.Call):
+            return None
+        args = tuple(ast.literal_eval(a) for a in call.args)
+        kwargs = tuple((k.arg, ast.literal_eval(k.value)) for k in call.keywords if k.arg)
+    except (SyntaxError, ValueError, TypeError):
+        return None
+
+    if path[0] == "avot":
+        ns, name, action = path
+        head = f"{ns}.{name}.{action}"
+    else:
+        ns, name, action = path[0], None, ".".join(path[1:])
+        head = f"{ns}.{action}"
+
+    canonical = f"{head}({_format_args(args, kwargs)})"
+    return CMSParseResult(ns, name, action, args, kwargs, origin, text, canonical)
+
+
+def interpret_natural_language(text: str) -> Optional[CMSParseResult]:
+    lowered = " ".join(text.lower().translate(_QUOTE_TBL).split()).rstrip(".!")
+    for pattern, template in _NL_RULES:
+        m = pattern.fullmatch(lowered)
+        if not m:
+            continue
+        groups = [g for g in m.groups() if g]
+        shorthand = template.format(groups[0].upper() if groups else "")
+        parsed = parse_shorthand(shorthand, origin="natural")
+        if parsed is not None:
+            return CMSParseResult(
+                parsed.ns, parsed.name, parsed.action, parsed.args, parsed.kwargs,
+                "natural", text, parsed.canonical,
+            )
+    return None
+
+
+def _format_arg(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, str) else repr(value)
+
+
+def _format_args(args: Tuple[Any, ...], kwargs: Tuple[Tuple[str, Any], ...]) -> str:
+    parts = [_format_arg(a) for a in args]
+    parts += [f"{k}={_format_arg(v)}" for k, v in kwargs]
+    return ", ".join(parts)
+
+
+# Longer texts (pasted content, chat) are classified but not cached, so
+# the cache can't pin up to maxsize arbitrarily large strings.
+_CLASSIFY_CACHE_MAX_LEN = 256
+
+
+def _classify_uncached(text: str) -> Tuple[str, Optional[CMSParseResult]]:
+    # Pure: regex + phrase scan only. Execution side effects stay in execute().
+    parsed = parse_shorthand(text)
+    if parsed is not None:
+        return "shorthand", parsed
+
+    parsed = interpret_natural_language(text)
+    if parsed is not None:
+        return "natural", parsed
+
+    return "unknown", None
+
+
+_classify = functools.lru_cache(maxsize=1024)(_classify_uncached)
+
+
+def execute_parsed(parsed: CMSParseResult) -> Any:
+    if parsed.ns == "avot":
+        from backend.avots.avots import call_avot
+        return call_avot(parsed.name, parsed.action)
+
+    if parsed.ns == "epoch":
+        from backend.state import epoch_engine
+        if parsed.action == "set":
+            return epoch_engine.set_epoch(*parsed.args)
+        if parsed.action == "get":
+            return epoch_engine.get_epoch_state()
+        if parsed.action == "next":
+            return epoch_engine.next_epoch()
+
+    from backend.orchestration import orchestrate_from_cms
+    return orchestrate_from_cms(parsed.canonical)
+
+
+def execute(text: str) -> CMSExecutionResult:
+    text = (text or "").strip()
+    classify = _classify if len(text) <= _CLASSIFY_CACHE_MAX_LEN else _classify_uncached
+    mode, parsed = classify(text)
+    if parsed is None:
+        return CMSExecutionResult(mode=mode, canonical=None, parsed=None)
+
+    try:
+        result = execute_parsed(parsed)
+    except Exception as e:
+        return CMSExecutionResult(mode=mode, canonical=parsed.canonical, parsed=parsed, error=str(e))
+
+    return CMSExecutionResult(mode=mode, canonical=parsed.canonical, parsed=parsed, result=result)
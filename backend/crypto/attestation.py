@@ -1,4 +1,5 @@
 import base64
+import functools
 import hashlib
 import json
 from typing import Any, Dict, Tuple
@@ -53,6 +54,17 @@ def public_key_bytes(priv: "Ed25519PrivateKey") -> bytes:
     )
 
 
+@functools.lru_cache(maxsize=8)
+def _signing_key(priv_b64: str) -> Tuple["Ed25519PrivateKey", str]:
+    """
+    Decoded private key and its key_id. The signing key is the same for
+    every event in a process, so decode + public-key derivation + hashing
+    happen once rather than per signature.
+    """
+    priv = load_private_key_b64(priv_b64)
+    return priv, derive_key_id(public_key_bytes(priv))
+
+
 def sign_entry_hash(
     priv_b64: str,
     entry_hash_hex: str,
@@ -60,9 +72,7 @@ def sign_entry_hash(
     """
     Sign a hash (hex) and return (signature_b64, key_id).
     """
-    priv = load_private_key_b64(priv_b64)
-    pub_bytes = public_key_bytes(priv)
-    key_id = derive_key_id(pub_bytes)
+    priv, key_id = _signing_key(priv_b64)
 
     sig = priv.sign(bytes.fromhex(entry_hash_hex))
     sig_b64 = base64.b64encode(sig).decode("utf-8")
@@ -0,0 +1,41 @@
+"""
+fs_helpers.py — small filesystem helpers shared by the CMS executor,
+the chronicle, the project graph and the phase engines.
+"""
+
+import os
+import stat
+from contextlib import contextmanager
+
+# VCS, dependency and tool-cache directories the repo walkers never descend
+# into. Other dot-directories (.github) are real repository content and stay.
+PRUNE_DIRS = frozenset({
+    ".git", "node_modules", "__pycache__",
+    ".venv", "venv", ".tox", ".nox",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    "coverage", ".coverage", "htmlcov",
+    ".tyme_cache",
+})
+
+
+@contextmanager
+def atomic_replace(path, text=False):
+    """Write `path` through a temp file renamed over it (symlinks followed)."""
+    target = os.path.realpath(path)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        mode = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        mode = None
+    try:
+        with open(tmp, "w", encoding="utf-8") if text else open(tmp, "wb", buffering=0) as f:
+            if mode is not None:
+                os.fchmod(f.fileno(), mode)
+            yield f
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
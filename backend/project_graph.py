@@ -14,6 +14,11 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+try:
+    from backend.fs_helpers import PRUNE_DIRS
+except ImportError:  # run as a script: python3 backend/project_graph.py
+    from fs_helpers import PRUNE_DIRS
+
 class ProjectGraph:
     def __init__(self, root="."):
         self.root = Path(root).resolve()
@@ -23,10 +28,23 @@ class ProjectGraph:
         self.call_index = defaultdict(set)     # function -> set(files that call it)
         self._scan()
 
+    def _iter_py_files(self):
+        # scandir walk: pruned directories are skipped at the point of
+        # descent (rglob would enumerate them first), and DirEntry's cached
+        # d_type answers is_dir/is_file without a stat per entry. Directory
+        # symlinks are never descended into, so link loops cannot recurse.
+        stack = [str(self.root)]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in PRUNE_DIRS:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(".py") and entry.is_file():
+                        yield Path(entry.path)
+
     def _scan(self):
-        for p in self.root.rglob("*.py"):
-            if "venv" in p.parts or ".git" in p.parts:
-                continue
+        for p in self._iter_py_files():
             self.files.append(p)
             try:
                 src = p.read_text(encoding="utf-8")
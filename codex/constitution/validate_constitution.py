@@ -3,7 +3,6 @@ import datetime as dt
 import json
 import os
 from pathlib import Path
-import importlib.util
 
 REQUIRED_INVARIANTS = {
     "default_authority": "off",
@@ -27,14 +26,31 @@ ALLOWED_ATTESTATION_PURPOSES = {
 ALLOWED_MODES = {"simulation_only", "enforce_opt_in"}
 
 
+_yaml = None
+_yaml_probed = False
+
+
+def _get_yaml():
+    """Import PyYAML once; None if it is not installed."""
+    global _yaml, _yaml_probed
+    if not _yaml_probed:
+        _yaml_probed = True
+        try:
+            import yaml
+        except ImportError:
+            yaml = None
+        _yaml = yaml
+    return _yaml
+
+
 def _load_yaml(path: Path, warnings: list[str]):
     if not path.exists():
         warnings.append(f"Missing constitution file: {path}")
         return None
-    if importlib.util.find_spec("yaml") is None:
+    yaml = _get_yaml()
+    if yaml is None:
         warnings.append("PyYAML is not installed; unable to parse constitution.v1.yaml")
         return None
-    import yaml
 
     try:
         return yaml.safe_load(path.read_text(encoding="utf-8"))
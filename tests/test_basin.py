@@ -0,0 +1,69 @@
+"""
+test_basin.py — latest-basin pointer (basin-index.json) staleness and repair.
+Run locally as: python3 -m pytest tests/test_basin.py
+"""
+
+import json
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from backend.basin import BasinEngine
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(BasinEngine, "OUTPUT_DIR", str(tmp_path))
+    return BasinEngine()
+
+
+def _basin(engine, version):
+    with open(os.path.join(engine.OUTPUT_DIR, f"basin-v{version}.json"), "w") as f:
+        json.dump({"version": version}, f)
+
+
+def _backdate_index(engine):
+    # As if the pointer was written well before the files that follow.
+    st = os.stat(engine._index_path())
+    os.utime(engine._index_path(), ns=(st.st_atime_ns, st.st_mtime_ns - 10**9))
+
+
+def test_stale_pointer_is_not_trusted(engine):
+    _basin(engine, "4")
+    engine.update_index("4")
+    _backdate_index(engine)
+    _basin(engine, "5")
+
+    assert engine.load_latest_basin()["version"] == "5"
+    assert engine.load_index() == {"latest": "5"}
+
+
+def test_lower_version_does_not_overwrite_newer_file_on_disk(engine):
+    _basin(engine, "4")
+    engine.update_index("4")
+    _backdate_index(engine)
+    _basin(engine, "5")
+
+    engine.update_index("4")  # e.g. compute() re-running an older version
+    assert engine.load_index() == {"latest": "5"}
+    assert engine.load_latest_basin()["version"] == "5"
+
+
+def test_unparseable_or_non_dict_index_is_repaired(engine):
+    _basin(engine, "2")
+    for bad in ({"latest": "bogus"}, ["not", "a", "dict"]):
+        with open(engine._index_path(), "w") as f:
+            json.dump(bad, f)
+        engine.update_index("2")
+        assert engine.load_index() == {"latest": "2"}
+
+
+def test_fresh_pointer_is_used(engine):
+    _basin(engine, "1")
+    _basin(engine, "3")
+    engine.update_index("3")
+    engine.update_index("1")  # older: ignored
+    assert engine.load_index() == {"latest": "3"}
+    assert engine.load_latest_basin()["version"] == "3"
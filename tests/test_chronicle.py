@@ -0,0 +1,109 @@
+"""
+test_chronicle.py — CMS hash chain (entry_hash_for, cms-log.head) and the
+orchestration log cap/archive spill.
+Run locally as: python3 -m pytest tests/test_chronicle.py
+"""
+
+import json
+
+import pytest
+
+from backend.chronicle import chronicle
+from backend.chronicle.chronicle import entry_hash_for, log_cms_event, log_orchestration_run
+
+
+@pytest.fixture
+def chron(tmp_path, monkeypatch):
+    monkeypatch.setattr(chronicle, "CMS_LOG_PATH", tmp_path / "cms-log.jsonl")
+    monkeypatch.setattr(chronicle, "CMS_HEAD_PATH", tmp_path / "cms-log.head")
+    monkeypatch.setattr(chronicle, "ORCH_LOG_PATH", tmp_path / "orchestration-log.json")
+    monkeypatch.setattr(chronicle, "ORCH_ARCHIVE_PATH", tmp_path / "orchestration-log.archive.jsonl")
+    monkeypatch.setattr(chronicle, "_ORCH_CACHE", None)
+    monkeypatch.delenv("TYME_SIGNING_PRIVATE_KEY_B64", raising=False)
+    return tmp_path
+
+
+def _entry(**kw):
+    entry = {
+        "timestamp": "t", "command": "c", "mode": "cms", "summary": "",
+        "commit_sha": None, "touched_files": [], "prev_hash": None,
+    }
+    entry.update(kw)
+    return entry
+
+
+def _cms_log(tmp_path):
+    return [json.loads(line) for line in (tmp_path / "cms-log.jsonl").read_text().splitlines()]
+
+
+def test_entry_hash_is_deterministic_and_ignores_extra_fields():
+    assert entry_hash_for(_entry()) == entry_hash_for(_entry())
+    assert entry_hash_for(_entry()) == entry_hash_for({**_entry(), "signature_b64": "s"})
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        (_entry(command="ab", summary="c"), _entry(command="a", summary="bc")),
+        (_entry(touched_files=["a", "b"]), _entry(touched_files=["ab"])),
+        (_entry(commit_sha=None), _entry(commit_sha="-")),
+        (_entry(commit_sha=None), _entry(commit_sha="")),
+        (_entry(touched_files=["x"], prev_hash=None), _entry(touched_files=[], prev_hash="x")),
+    ],
+)
+def test_entry_hash_separates_field_boundaries(a, b):
+    assert entry_hash_for(a) != entry_hash_for(b)
+
+
+def test_events_are_chained(chron):
+    log_cms_event("one")
+    log_cms_event("two", touched_files=["a.md"])
+    first, second = _cms_log(chron)
+    assert first["prev_hash"] is None
+    assert second["prev_hash"] == first["entry_hash"]
+    assert second["entry_hash"] == entry_hash_for(second)
+
+
+def test_stale_head_sidecar_is_ignored(chron):
+    log_cms_event("one")
+    # A line arrives from elsewhere (e.g. a pull): the sidecar's size no longer matches.
+    other = {**_entry(command="pulled"), "entry_hash": "f" * 64}
+    with open(chron / "cms-log.jsonl", "a") as f:
+        f.write(json.dumps(other) + "\n")
+    log_cms_event("two")
+    assert _cms_log(chron)[-1]["prev_hash"] == "f" * 64
+
+
+def test_missing_head_sidecar_falls_back_to_last_line(chron):
+    log_cms_event("one")
+    (chron / "cms-log.head").unlink()
+    log_cms_event("two")
+    first, second = _cms_log(chron)
+    assert second["prev_hash"] == first["entry_hash"]
+
+
+def test_orchestration_log_is_capped_and_spills_in_order(chron, monkeypatch):
+    monkeypatch.setattr(chronicle, "ORCH_LOG_CAP", 3)
+    for i in range(5):
+        log_orchestration_run(f"C{i}")
+    kept = json.loads((chron / "orchestration-log.json").read_text())
+    archived = [json.loads(line) for line in (chron / "orchestration-log.archive.jsonl").read_text().splitlines()]
+    assert [e["code"] for e in archived] == ["C0", "C1"]
+    assert [e["code"] for e in kept] == ["C2", "C3", "C4"]
+
+
+def test_failed_log_rewrite_keeps_spilled_entries_archived(chron, monkeypatch):
+    monkeypatch.setattr(chronicle, "ORCH_LOG_CAP", 2)
+    log_orchestration_run("C0")
+    log_orchestration_run("C1")
+
+    def boom(path, entries):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(chronicle, "_write_log", boom)
+    with pytest.raises(OSError):
+        log_orchestration_run("C2")
+    kept = json.loads((chron / "orchestration-log.json").read_text())
+    archived = (chron / "orchestration-log.archive.jsonl").read_text()
+    assert [e["code"] for e in kept] == ["C0", "C1"]
+    assert json.loads(archived)["code"] == "C0"
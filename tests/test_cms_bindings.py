@@ -0,0 +1,125 @@
+"""
+test_cms_bindings.py — plan extraction from raw model output, the
+response_format fallback that feeds it, and the semantic plan cache.
+Run locally as: python3 -m pytest tests/test_cms_bindings.py
+"""
+
+from array import array
+from types import SimpleNamespace
+
+import pytest
+
+from backend import cms_bindings
+from backend.cms_bindings import (
+    clean_user_input,
+    extract_first_json_object,
+    request_plan,
+    semantic_lookup,
+    semantic_store,
+)
+
+
+def test_brace_inside_string_does_not_end_object():
+    text = 'Here is the plan: {"summary": "close }", "steps": []} done.'
+    assert extract_first_json_object(text) == {"summary": "close }", "steps": []}
+
+
+def test_escaped_quote_inside_string():
+    text = '{"summary": "say \\"hi\\" {", "steps": [{"op": "mkdir", "file": "a"}]}'
+    plan = extract_first_json_object(text)
+    assert plan["summary"] == 'say "hi" {'
+    assert plan["steps"] == [{"op": "mkdir", "file": "a"}]
+
+
+def test_fenced_output_with_leading_prose_braces():
+    text = 'Note {not json}\n```json\n{"steps": [], "summary": "s"}\n```\ntrailing }'
+    assert extract_first_json_object(text) == {"steps": [], "summary": "s"}
+
+
+def test_no_object_raises():
+    with pytest.raises(ValueError):
+        extract_first_json_object('{"unterminated": "}')
+
+
+def test_truncated_plan_does_not_return_nested_step():
+    text = '{"summary": "x", "steps": [{"op": "create", "file": "a"}, {"op": "delete"'
+    with pytest.raises(ValueError):
+        extract_first_json_object(text)
+
+
+def test_malformed_object_is_skipped_whole():
+    text = '{"bad": {"inner": 1}, oops} then {"steps": [], "summary": "s"}'
+    assert extract_first_json_object(text) == {"steps": [], "summary": "s"}
+
+
+class _Rejected(Exception):
+    status_code = 400
+
+
+class FakeClient:
+    """Rejects the response formats in `reject`; otherwise streams `reply`."""
+
+    def __init__(self, reply, reject=()):
+        self.reply, self.reject, self.formats = reply, reject, []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        fmt = kwargs.get("response_format")
+        self.formats.append(fmt and fmt["type"])
+        if fmt and fmt["type"] in self.reject:
+            raise _Rejected(f"{fmt['type']} not supported")
+        delta = SimpleNamespace(content=self.reply, refusal=None)
+        return [SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason="stop")])]
+
+
+def test_structured_reply_is_parsed_directly():
+    client = FakeClient('{"steps": [], "summary": "s"}')
+    assert request_plan(client, "m", "x") == {"steps": [], "summary": "s"}
+    assert client.formats == ["json_schema"]
+
+
+def test_rejected_json_schema_falls_back_to_json_object_and_extracts():
+    client = FakeClient('```json\n{"steps": [], "summary": "s"}\n```', reject={"json_schema"})
+    assert request_plan(client, "m", "x") == {"steps": [], "summary": "s"}
+    assert client.formats == ["json_schema", "json_object"]
+
+
+def test_plain_text_is_the_last_resort():
+    client = FakeClient('Plan: {"steps": [], "summary": "s"}', reject={"json_schema", "json_object"})
+    assert request_plan(client, "m", "x") == {"steps": [], "summary": "s"}
+    assert client.formats == ["json_schema", "json_object", None]
+
+
+def test_other_errors_are_not_retried():
+    client = FakeClient("{}")
+    client.chat.completions.create = lambda **kw: (_ for _ in ()).throw(RuntimeError("boom"))
+    with pytest.raises(RuntimeError, match="boom"):
+        request_plan(client, "m", "x")
+
+
+def test_clean_user_input_leaves_quotes_alone():
+    assert clean_user_input("  cms(Write “Tyme’s log” to notes.md)  ") == "Write “Tyme’s log” to notes.md"
+
+
+@pytest.fixture
+def semantic_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cms_bindings, "EMBED_PATH", tmp_path / "embeddings.f32")
+    monkeypatch.setattr(cms_bindings, "EMBED_KEYS_PATH", tmp_path / "keys.jsonl")
+
+
+def test_semantic_hit_needs_same_literals_and_verbs(semantic_cache):
+    vec = array("f", [1.0, 0.0])
+    semantic_store(vec, "delete docs/a.md", "k1")
+    assert semantic_lookup(vec, "please delete docs/a.md") == "k1"
+    assert semantic_lookup(vec, "delete docs/b.md") is None
+    assert semantic_lookup(vec, "create docs/a.md") is None
+    assert semantic_lookup(array("f", [0.0, 1.0]), "delete docs/a.md") is None
+
+
+def test_semantic_scan_is_capped_to_recent_rows(semantic_cache, monkeypatch):
+    monkeypatch.setattr(cms_bindings, "SEMANTIC_MAX_ENTRIES", 2)
+    vec = array("f", [1.0, 0.0])
+    for i in range(3):
+        semantic_store(vec, f"delete docs/{i}.md", f"k{i}")
+    assert semantic_lookup(vec, "delete docs/0.md") is None
+    assert semantic_lookup(vec, "delete docs/2.md") == "k2"
@@ -0,0 +1,242 @@
+"""
+test_cms_executor.py — plan execution in cms_bindings: step preparation,
+parallel application, atomic writes, the plan cache, the commit and the
+repo index scan, against a scratch repository.
+Run locally as: python3 -m pytest tests/test_cms_executor.py
+"""
+
+import os
+import stat
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from backend import cms_bindings
+from backend.cms_bindings import (
+    PreparedStep,
+    _apply_prepared,
+    _steps_independent,
+    load_cached_plan,
+    plan_cache_key,
+    prepare_steps,
+    run_plan,
+    safe_commit,
+    scan_repo_index,
+    store_cached_plan,
+    write_file,
+)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cms_bindings, "REPO_ROOT", Path(tmp_path))
+    monkeypatch.setattr(cms_bindings, "_ROOT_STR", str(tmp_path))
+    monkeypatch.setattr(cms_bindings, "DRY_RUN", False)
+    cms_bindings._normalize_rel_path.cache_clear()
+    cms_bindings._MKDIR_DONE.clear()
+    cms_bindings._DIR_OK.clear()
+    return tmp_path
+
+
+def test_delete_removes_only_regular_files(repo):
+    (repo / "a.txt").write_text("x")
+    (repo / "d").mkdir()
+    os.symlink("d", repo / "link")
+    touched = []
+    for path in ("a.txt/below", "missing.txt", "d", "link", "a.txt"):
+        _apply_prepared("delete", path, None, touched)
+    assert touched == ["a.txt"]
+    assert not (repo / "a.txt").exists()
+    assert (repo / "d").is_dir() and (repo / "link").is_symlink()
+
+
+def test_delete_under_dry_run_reports_but_keeps_the_file(repo, monkeypatch):
+    monkeypatch.setattr(cms_bindings, "DRY_RUN", True)
+    (repo / "a.txt").write_text("x")
+    touched = []
+    _apply_prepared("delete", "a.txt", None, touched)
+    _apply_prepared("delete", "missing.txt", None, touched)
+    assert touched == ["a.txt"]
+    assert (repo / "a.txt").exists()
+
+
+def _git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def git_repo(repo, monkeypatch):
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.name", "t")
+    _git(repo, "config", "user.email", "t@example.com")
+    monkeypatch.setattr(cms_bindings, "_GIT_CFG", None)
+    return repo
+
+
+def _step(op, file, content=None):
+    return {"op": op, "file": file, "content": content}
+
+
+def test_consecutive_writes_to_one_file_are_coalesced(repo):
+    prepared = prepare_steps([
+        _step("create", "a.md", "one"),
+        _step("patch", "a.md", "two"),
+        _step("create", "b.md", "b"),
+        _step("patch", "a.md", "three"),
+        _step("replace", "a.md", "four"),
+        _step("patch", "a.md", "five\n"),
+    ])
+    assert prepared == [
+        PreparedStep("create", "a.md", "one\ntwo\n"),
+        PreparedStep("create", "b.md", "b\n"),
+        PreparedStep("replace", "a.md", "four\nfive\n"),
+    ]
+
+
+def test_structured_content_and_other_ops_are_not_coalesced(repo):
+    prepared = prepare_steps([
+        _step("create", "a.json", {"k": 1}),
+        _step("patch", "a.json", {"k": 2}),
+        _step("delete", "a.json"),
+    ])
+    assert [p.op for p in prepared] == ["create", "patch", "delete"]
+
+
+@pytest.mark.parametrize(
+    "paths, ops, independent",
+    [
+        (["a", "b", "c/d"], ["create"] * 3, True),
+        (["a", "b", "a"], ["create"] * 3, False),
+        (["a", "a/b", "c"], ["create"] * 3, False),
+        (["a", "b", "c"], ["create", "delete", "create"], False),
+        (["a", "b", "c"], ["create", "mkdir", "create"], False),
+    ],
+)
+def test_steps_independent(paths, ops, independent):
+    prepared = [PreparedStep(op, path, "x") for op, path in zip(ops, paths)]
+    assert _steps_independent(prepared) is independent
+
+
+def test_independent_plan_runs_on_the_pool_and_keeps_plan_order(repo, monkeypatch):
+    pools, commits = [], []
+    real_pool = cms_bindings.ThreadPoolExecutor
+    monkeypatch.setattr(cms_bindings, "ThreadPoolExecutor", lambda **kw: pools.append(kw) or real_pool(**kw))
+    monkeypatch.setattr(cms_bindings, "safe_commit", lambda summary, touched: commits.append(touched))
+    names = [f"d{i}/f.md" for i in range(6)]
+    run_plan({"summary": "s", "steps": [_step("create", n, n) for n in names]})
+    assert pools and commits == [names]
+    assert all((repo / n).read_text() == n + "\n" for n in names)
+
+
+def test_dependent_plan_runs_in_order(repo, monkeypatch):
+    pools = []
+    monkeypatch.setattr(cms_bindings, "ThreadPoolExecutor", lambda **kw: pools.append(kw))
+    monkeypatch.setattr(cms_bindings, "safe_commit", lambda summary, touched: None)
+    run_plan({"steps": [_step("create", "a.md", "x"), _step("delete", "a.md"), _step("create", "b.md", "y")]})
+    assert pools == []
+    assert not (repo / "a.md").exists() and (repo / "b.md").read_text() == "y\n"
+
+
+def test_overwrite_is_atomic_and_writes_through_symlinks(repo):
+    (repo / "real.md").write_text("old")
+    os.chmod(repo / "real.md", 0o640)
+    os.symlink("real.md", repo / "link.md")
+    write_file(str(repo / "link.md"), [b"new", b"\n"])
+    assert (repo / "link.md").is_symlink()
+    assert (repo / "real.md").read_text() == "new\n"
+    assert stat.S_IMODE(os.stat(repo / "real.md").st_mode) == 0o640
+    assert sorted(p.name for p in repo.iterdir()) == ["link.md", "real.md"]
+
+
+def test_failed_overwrite_leaves_the_old_file(repo, monkeypatch):
+    (repo / "a.md").write_text("old")
+
+    def boom(fd, chunks):
+        os.write(fd, b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cms_bindings, "_write_chunks", boom)
+    with pytest.raises(OSError):
+        write_file(str(repo / "a.md"), [b"new"])
+    assert (repo / "a.md").read_text() == "old"
+    assert [p.name for p in repo.iterdir()] == ["a.md"]
+
+
+def test_append_extends_the_file(repo):
+    (repo / "a.md").write_text("one\n")
+    write_file(str(repo / "a.md"), [b"two", b"\n"], append=True)
+    assert (repo / "a.md").read_text() == "one\ntwo\n"
+
+
+def test_plan_cache_key_changes_with_model_and_prompt(monkeypatch):
+    key = plan_cache_key("m", "do x")
+    assert key == plan_cache_key("m", "do x")
+    assert key != plan_cache_key("m2", "do x")
+    assert key != plan_cache_key("m", "do y")
+    monkeypatch.setattr(cms_bindings, "_SYSTEM_PROMPT_DIGEST", "edited prompt")
+    assert key != plan_cache_key("m", "do x")
+
+
+def test_plan_cache_round_trip_and_ttl(tmp_path, monkeypatch):
+    monkeypatch.setattr(cms_bindings, "PLAN_CACHE_DIR", tmp_path / "plans")
+    monkeypatch.delenv("TYME_CACHE_TTL", raising=False)
+    plan = {"summary": "s", "steps": [_step("create", "a.md", "“x”")]}
+    assert load_cached_plan("k") is None
+    store_cached_plan("k", plan)
+    assert load_cached_plan("k") == plan
+
+    old = time.time() - 120
+    os.utime(tmp_path / "plans" / "k.json", (old, old))
+    monkeypatch.setenv("TYME_CACHE_TTL", "60")
+    assert load_cached_plan("k") is None
+    monkeypatch.setenv("TYME_CACHE_TTL", "600")
+    assert load_cached_plan("k") == plan
+
+
+def test_safe_commit_stages_only_touched_paths(git_repo):
+    for name in ("-dash.md", "with space.md", "untouched.md"):
+        (git_repo / name).write_text("x")
+    safe_commit("add files\nsecond line", ["-dash.md", "with space.md", "-dash.md"])
+    assert _git(git_repo, "log", "--format=%s").strip() == "add files second line"
+    assert _git(git_repo, "show", "--name-only", "--format=").split("\n")[:2] == ["-dash.md", "with space.md"]
+    assert "untouched.md" in _git(git_repo, "status", "--porcelain")
+
+
+def test_safe_commit_without_changes_makes_no_commit(git_repo):
+    safe_commit("nothing", [])
+    assert subprocess.run(["git", "rev-parse", "HEAD"], cwd=git_repo, capture_output=True).returncode != 0
+
+
+def test_scan_repo_index_buckets_by_top_level_directory(repo):
+    for rel in ("scrolls/s.md", "forge/f.json", "backend/b.py", "frontend/app.js",
+                "public/index.html", "assets/logo.svg", "other/o.txt", "node_modules/x.js"):
+        (repo / rel).parent.mkdir(parents=True, exist_ok=True)
+        (repo / rel).write_text("x")
+    index = scan_repo_index()
+    assert index["scrolls"] == ["scrolls/s.md"]
+    assert index["backend_modules"] == ["backend/b.py"]
+    assert index["frontend_assets"] == ["assets/logo.svg", "frontend/app.js", "public/index.html"]
+    assert "other/o.txt" in index["files"]
+    assert not any(f.startswith("node_modules") for f in index["files"])
+
+
+def test_safe_commit_reports_a_failed_add(git_repo):
+    with pytest.raises(RuntimeError, match="git add"):
+        safe_commit("s", ["does-not-exist.md"])
+
+
+def test_dry_run_writes_no_plan_cache(repo, monkeypatch):
+    monkeypatch.setattr(cms_bindings, "DRY_RUN", True)
+    monkeypatch.setattr(cms_bindings, "PLAN_CACHE_DIR", repo / "plans")
+    monkeypatch.setenv("TYME_CACHE", "1")
+    monkeypatch.setattr(sys, "argv", ["cms_bindings.py", "add a note"])
+    monkeypatch.setattr(cms_bindings, "_openai_client", lambda: None)
+    monkeypatch.setattr(cms_bindings, "request_plan", lambda *a: {"steps": [_step("create", "a.md", "x")]})
+    monkeypatch.setattr(cms_bindings, "safe_commit", lambda summary, touched: None)
+    cms_bindings.main()
+    assert not (repo / "a.md").exists()
+    assert not (repo / "plans").exists()
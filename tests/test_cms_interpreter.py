@@ -0,0 +1,101 @@
+"""
+test_cms_interpreter.py — shorthand, natural-language and unknown paths of
+cms_bindings.execute() (backend/cms_interpreter.py).
+Run locally as: python3 -m pytest tests/test_cms_interpreter.py
+"""
+
+import pytest
+
+from backend import cms_bindings, cms_interpreter
+from backend.cms_interpreter import _classify, execute
+
+
+@pytest.fixture(autouse=True)
+def no_side_effects(monkeypatch):
+    # Record what would run instead of touching epoch state or the AVOTs.
+    calls = []
+    monkeypatch.setattr(cms_interpreter, "execute_parsed", lambda parsed: calls.append(parsed.canonical) or "ran")
+    _classify.cache_clear()
+    return calls
+
+
+def test_shorthand_is_parsed_and_executed(no_side_effects):
+    res = execute("tyme.cycle(“C07”)")
+    assert res.mode == "shorthand"
+    assert res.canonical == 'tyme.cycle("C07")'
+    assert res.parsed.ns == "tyme" and res.parsed.args == ("C07",)
+    assert res.result == "ran"
+    assert no_side_effects == ['tyme.cycle("C07")']
+
+
+def test_shorthand_outside_known_namespaces_is_unknown():
+    assert _classify("os.system('ls')") == ("unknown", None)
+    assert _classify("avot.guardian()") == ("unknown", None)
+
+
+@pytest.mark.parametrize(
+    "text, canonical",
+    [
+        ("Awaken Tyme.", "tyme.init()"),
+        ("Run the full 24-cycle harmonic pulse.", "tyme.orchestrate(24)"),
+        ("Run cycle C07.", 'tyme.cycle("C07")'),
+        ("Show me Tyme’s last evolution trace.", "tyme.last()"),
+        ("Summon Guardian to evaluate coherence and alignment.", "avot.guardian.check()"),
+        ("Shift Tyme into Epoch: HARMONIC.", 'epoch.set("HARMONIC")'),
+        ("Enter the CONVERGENCE epoch.", 'epoch.set("CONVERGENCE")'),
+        ("Tune the Rhythm Engine to Mode 3.", "rhythm.set(3)"),
+        ("Expand the AVOT lattice.", 'evolve.expand("avot")'),
+    ],
+)
+def test_documented_phrasings_map_to_shorthand(text, canonical):
+    mode, parsed = _classify(text)
+    assert mode == "natural"
+    assert parsed.canonical == canonical
+    assert parsed.origin == "natural" and parsed.raw == text
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "the guardian said hi",
+        "run a 3-cycle pass",
+        "we reached convergence",
+        "Run the next cycle.",
+        "",
+    ],
+)
+def test_ordinary_chat_runs_nothing(text, no_side_effects):
+    res = execute(text)
+    assert res.mode == "unknown"
+    assert res.parsed is None and res.result is None
+    assert no_side_effects == []
+
+
+def test_execution_error_is_reported(monkeypatch):
+    def boom(parsed):
+        raise RuntimeError("engine offline")
+
+    monkeypatch.setattr(cms_interpreter, "execute_parsed", boom)
+    res = execute("epoch.get()")
+    assert res.mode == "shorthand" and res.error == "engine offline"
+
+
+def test_classification_is_cached_but_execution_is_not(no_side_effects):
+    execute("Awaken Tyme.")
+    execute("Awaken Tyme.")
+    info = _classify.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert _classify("Awaken Tyme.")[1] is _classify("Awaken Tyme.")[1]
+    assert no_side_effects == ["tyme.init()", "tyme.init()"]
+
+
+def test_cms_bindings_reexports_execute():
+    assert cms_bindings.execute is execute
+
+
+def test_long_texts_are_not_cached(no_side_effects):
+    text = "Awaken Tyme." + " " * 300 + "please"
+    execute(text)
+    execute("x" * 1000)
+    assert _classify.cache_info().currsize == 0
+    assert no_side_effects == []